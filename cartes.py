@@ -20,14 +20,19 @@ Exemples :
 
 Dépendances :
     pip install pymupdf pillow numpy
+    pip install scipy  # optionnel, accélère le fond transparent
 """
 
 import argparse
 import os
 import sys
 import json
-import colorsys
+import functools
+import itertools
+import math
 import re
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Tuple, Optional, Dict, Any, List
 
@@ -35,60 +40,185 @@ import numpy as np
 from PIL import Image
 import fitz  # PyMuPDF
 
+try:
+    from scipy import ndimage  # optionnel : accélère le fond transparent
+except ImportError:
+    ndimage = None
+
 
 def fail(msg: str, code: int = 1):
     print(f"ERROR: {msg}", file=sys.stderr)
     sys.exit(code)
 
 
-def render_page_to_image(page: fitz.Page, dpi: int = 300) -> Image.Image:
+# Aperçu basse résolution (18 DPI) utilisé pour repérer la zone utile avant le rendu final
+PREVIEW_SCALE = 0.25
+
+
+def render_page_to_array(page: fitz.Page, dpi: int = 300, clip: Optional[fitz.Rect] = None) -> np.ndarray:
+    """Rend la page (ou la zone `clip`) en tableau RGB (H, W, 3) uint8, sans passer par une image PIL."""
     scale = dpi / 72.0
     mat = fitz.Matrix(scale, scale)
-    pix = page.get_pixmap(matrix=mat, alpha=False)
-    mode = "RGB" if pix.alpha == 0 else "RGBA"
-    img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-    if img.mode not in ("RGB", "L"):
-        img = img.convert("RGB")
-    return img
-
-
-def to_rgb_white_bg(img: Image.Image) -> Image.Image:
-    if img.mode == "RGB":
-        return img
-    if img.mode in ("RGBA", "LA"):
-        bg = Image.new("RGB", img.size, (255, 255, 255))
-        bg.paste(img, mask=img.split()[-1])
-        return bg
-    return img.convert("RGB")
-
-
-def crop_to_one_px_margin(img: Image.Image, white_threshold: int = 245, edge_tolerance: float = 0.01) -> Image.Image:
-    img = to_rgb_white_bg(img)
-    arr = np.asarray(img, dtype=np.uint8)
-    y = (0.2126 * arr[:, :, 0] + 0.7152 * arr[:, :, 1] + 0.0722 * arr[:, :, 2]).astype(np.float32)
-
-    nonwhite = y < white_threshold
-    coords = np.argwhere(nonwhite)
-    if coords.size == 0:
+    pix = page.get_pixmap(matrix=mat, clip=clip, colorspace=fitz.csRGB, alpha=False)
+    arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    pix = None  # arr garde sa propre copie des octets : le pixmap MuPDF peut être libéré tout de suite
+    return arr
+
+
+def _content_bounds(arr: np.ndarray, white_threshold: int, band_rows: int = 256) -> Optional[Tuple[int, int, int, int]]:
+    """Renvoie (top, left, bottom, right) inclusifs des pixels non blancs, ou None.
+
+    `arr` est RGB (H, W, 3) ou niveaux de gris (H, W). Un pixel est "non blanc" dès qu'un
+    de ses canaux passe sous le seuil. Le calcul se fait par bandes de `band_rows` lignes
+    dans des tampons réutilisés : seules les projections lignes/colonnes sont conservées,
+    jamais de masque à la taille de la page. Le minimum des canaux passe par np.minimum
+    canal par canal, bien plus rapide que arr.min(axis=2).
+    """
+    h, w = arr.shape[:2]
+    rows = np.empty(h, dtype=bool)
+    cols = np.zeros(w, dtype=bool)
+    band_rows = max(1, min(band_rows, h))
+    min_buf = np.empty((band_rows, w), dtype=np.uint8) if arr.ndim == 3 else None
+    mask_buf = np.empty((band_rows, w), dtype=bool)
+    for y0 in range(0, h, band_rows):
+        band = arr[y0:y0 + band_rows]
+        n = band.shape[0]
+        nonwhite = mask_buf[:n]
+        if band.ndim == 2:
+            np.less(band, white_threshold, out=nonwhite)
+        else:
+            m = min_buf[:n]
+            np.minimum(band[:, :, 0], band[:, :, 1], out=m)
+            np.minimum(m, band[:, :, 2], out=m)
+            np.less(m, white_threshold, out=nonwhite)
+        rows[y0:y0 + n] = nonwhite.any(axis=1)
+        cols |= nonwhite.any(axis=0)
+
+    if not rows.any():
+        return None
+    top = int(rows.argmax())
+    bottom = h - 1 - int(rows[::-1].argmax())
+    left = int(cols.argmax())
+    right = w - 1 - int(cols[::-1].argmax())
+    return top, left, bottom, right
+
+
+def locate_content_rect(page: fitz.Page, dpi: int = 300, preview_scale: float = PREVIEW_SCALE) -> Optional[fitz.Rect]:
+    """Repère la zone utile de la page sur un aperçu basse résolution.
+
+    Tout pixel d'aperçu qui n'est pas blanc pur compte comme contenu (l'anticrénelage
+    éclaircit les traits fins), et on garde un pixel d'aperçu de marge. Le rectangle est
+    aligné sur la grille de pixels du rendu à `dpi`, pour que le rendu découpé soit
+    identique à la même zone du rendu complet.
+    Renvoie None si la page est vide ou si sa géométrie ne permet pas le raccourci.
+    """
+    page_rect = page.rect
+    if page.rotation != 0 or page_rect.x0 != 0 or page_rect.y0 != 0:
+        return None
+    # Seule la position du contenu compte : un aperçu en niveaux de gris suffit (1 octet/pixel)
+    preview = page.get_pixmap(
+        matrix=fitz.Matrix(preview_scale, preview_scale), colorspace=fitz.csGRAY, alpha=False
+    )
+    parr = np.frombuffer(preview.samples, dtype=np.uint8).reshape(preview.height, preview.width)
+    preview = None
+    bounds = _content_bounds(parr, 255)
+    if bounds is None:
+        return None
+
+    top, left, bottom, right = bounds
+    scale = dpi / 72.0
+    rect = fitz.Rect(
+        math.floor((left - 1) / preview_scale * scale) / scale,
+        math.floor((top - 1) / preview_scale * scale) / scale,
+        math.ceil((right + 2) / preview_scale * scale) / scale,
+        math.ceil((bottom + 2) / preview_scale * scale) / scale,
+    )
+    return rect & page_rect
+
+
+def render_page_content(page: fitz.Page, dpi: int = 300) -> np.ndarray:
+    """Rend à `dpi` uniquement la zone utile de la page (repérée sur un aperçu).
+
+    Si un bord du rendu découpé intérieur à la page n'est pas blanc pur, du contenu a pu
+    échapper à l'aperçu : on retombe alors sur le rendu complet.
+    """
+    clip = locate_content_rect(page, dpi=dpi)
+    if clip is not None and not clip.is_empty:
+        arr = render_page_to_array(page, dpi=dpi, clip=clip)
+        page_rect = page.rect
+        edges = []
+        if clip.y0 > page_rect.y0:
+            edges.append(arr[0, :])
+        if clip.y1 < page_rect.y1:
+            edges.append(arr[-1, :])
+        if clip.x0 > page_rect.x0:
+            edges.append(arr[:, 0])
+        if clip.x1 < page_rect.x1:
+            edges.append(arr[:, -1])
+        if all((edge == 255).all() for edge in edges):
+            return arr
+        arr = edges = None  # libère le rendu découpé avant le rendu complet
+    return render_page_to_array(page, dpi=dpi)
+
+
+# Part du cache MuPDF libérée après chaque page : les éléments récents (polices,
+# images partagées entre pages) restent, mais la taille reste bornée quelle que soit
+# la longueur du document.
+STORE_SHRINK_PERCENT = 50
+
+
+def render_page(doc: fitz.Document, pno: int, dpi: int = 300) -> np.ndarray:
+    """Rend la zone utile de la page `pno`, puis réduit le cache interne de MuPDF
+    (images et polices décodées) pour que la mémoire ne croisse pas avec le nombre de pages."""
+    page = doc.load_page(pno)
+    arr = render_page_content(page, dpi=dpi)
+    page = None
+    fitz.TOOLS.store_shrink(STORE_SHRINK_PERCENT)
+    return arr
+
+
+# Poids BT.709 (0.2126, 0.7152, 0.0722) en virgule fixe sur 256
+_LUMA_WEIGHTS = (54, 183, 19)
+
+
+def _luma_u8(arr: np.ndarray) -> np.ndarray:
+    """Luminance BT.709 en virgule fixe, en uint8, d'un tableau RGB ou RGBA.
+
+    Chaque canal est multiplié directement dans un tampon uint16 puis cumulé avec
+    np.add(out=...) : pas de copie float32 ni uint16 de l'image entière en RGB.
+    """
+    acc = np.empty(arr.shape[:2], dtype=np.uint16)
+    scratch = np.empty_like(acc)
+    np.multiply(arr[:, :, 0], _LUMA_WEIGHTS[0], out=acc, dtype=np.uint16)
+    for channel in (1, 2):
+        np.multiply(arr[:, :, channel], _LUMA_WEIGHTS[channel], out=scratch, dtype=np.uint16)
+        np.add(acc, scratch, out=acc)
+    np.right_shift(acc, 8, out=acc)
+    return acc.astype(np.uint8)
+
+
+def crop_to_one_px_margin(arr: np.ndarray, white_threshold: int = 245, edge_tolerance: float = 0.01) -> np.ndarray:
+    # Le fond est blanc pur : un pixel est "non blanc" dès qu'un de ses canaux passe sous le seuil
+    bounds = _content_bounds(arr, white_threshold)
+    if bounds is None:
         fail("Page appears blank (no non-white content found).")
 
-    (top, left), (bottom, right) = coords.min(0), coords.max(0)
+    h, w = arr.shape[:2]
+    top, left, bottom, right = bounds
     top = max(0, top - 1)
     left = max(0, left - 1)
-    bottom_ex = min(img.height, bottom + 1 + 1)
-    right_ex = min(img.width, right + 1 + 1)
-    cropped = img.crop((left, top, right_ex, bottom_ex))
+    bottom_ex = min(h, bottom + 1 + 1)
+    right_ex = min(w, right + 1 + 1)
+    c = arr[top:bottom_ex, left:right_ex]
 
-    c = np.asarray(cropped, dtype=np.uint8)
-    y_c = (0.2126 * c[:, :, 0] + 0.7152 * c[:, :, 1] + 0.0722 * c[:, :, 2]).astype(np.float32)
+    def frac_nonwhite_edge(strip: np.ndarray) -> float:
+        # strip : (N, 3), une ligne ou colonne de bord uniquement
+        return float((strip < white_threshold).any(axis=-1).mean())
 
-    def frac_nonwhite_edge(edge_vals: np.ndarray) -> float:
-        return float((edge_vals < white_threshold).sum()) / float(edge_vals.size)
-
-    top_bad = frac_nonwhite_edge(y_c[0, :])
-    bottom_bad = frac_nonwhite_edge(y_c[-1, :])
-    left_bad = frac_nonwhite_edge(y_c[:, 0])
-    right_bad = frac_nonwhite_edge(y_c[:, -1])
+    top_bad = frac_nonwhite_edge(c[0, :])
+    bottom_bad = frac_nonwhite_edge(c[-1, :])
+    left_bad = frac_nonwhite_edge(c[:, 0])
+    right_bad = frac_nonwhite_edge(c[:, -1])
 
     if max(top_bad, bottom_bad, left_bad, right_bad) > edge_tolerance:
         fail(
@@ -98,62 +228,75 @@ def crop_to_one_px_margin(img: Image.Image, white_threshold: int = 245, edge_tol
             "Try a higher --white-threshold or check page margins."
         )
 
-    return cropped
+    return c
 
 
-def split_halves(img: Image.Image) -> Tuple[Image.Image, Image.Image]:
-    w, h = img.size
+def split_halves(arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    h, w = arr.shape[:2]
     mid = w // 2
-    left = img.crop((0, 0, mid, h))
-    right = img.crop((mid, 0, w, h))
-    if abs(left.width - right.width) > 1:
-        fail(f"Format violation: left/right halves differ too much in width ({left.width}px vs {right.width}px).")
-    if left.height != right.height:
+    left = arr[:, :mid]
+    right = arr[:, mid:]
+    if abs(left.shape[1] - right.shape[1]) > 1:
+        fail(f"Format violation: left/right halves differ too much in width ({left.shape[1]}px vs {right.shape[1]}px).")
+    if left.shape[0] != right.shape[0]:
         fail("Format violation: left/right halves have different heights.")
     return left, right
 
 
-def split_rows(side_img: Image.Image, expected_rows: int = 4, tolerance_px: int = 2) -> Tuple[Image.Image, ...]:
-    w, h = side_img.size
-    base = h / expected_rows
-    cuts = [0]
-    acc = 0.0
-    for _ in range(expected_rows - 1):
-        acc += base
-        cuts.append(int(round(acc)))
-    cuts.append(h)
-
-    rows, heights = [], []
-    for i in range(expected_rows):
-        top, bottom = cuts[i], cuts[i + 1]
-        if bottom <= top:
-            fail("Format violation: could not split page side into strictly increasing row bounds.")
-        rows.append(side_img.crop((0, top, w, bottom)))
-        heights.append(bottom - top)
-
-    if (max(heights) - min(heights)) > tolerance_px:
+def split_rows(side: np.ndarray, expected_rows: int = 4, tolerance_px: int = 2) -> Tuple[np.ndarray, ...]:
+    h = side.shape[0]
+    cuts = np.linspace(0, h, expected_rows + 1).round().astype(np.int64)
+    heights = np.diff(cuts)
+    if (heights <= 0).any():
+        fail("Format violation: could not split page side into strictly increasing row bounds.")
+
+    spread = int(heights.max() - heights.min())
+    if spread > tolerance_px:
         fail(
-            f"Format violation: row heights vary too much ({heights}); "
-            f"max spread {max(heights)-min(heights)}px > {tolerance_px}px. "
+            f"Format violation: row heights vary too much ({heights.tolist()}); "
+            f"max spread {spread}px > {tolerance_px}px. "
         )
-    return tuple(rows)
+    return tuple(side[cuts[i]:cuts[i + 1]] for i in range(expected_rows))
+
+
+def _image_from_view(view: np.ndarray) -> Image.Image:
+    """Image PIL depuis un tableau RGB ou RGBA, sans copie intermédiaire pour une vue RGB.
+
+    Image.fromarray recopie d'abord une vue non contiguë avec tobytes() ; pour une vue RGB
+    de la page, le décodeur "raw" de Pillow lit directement les lignes espacées de
+    strides[0] octets.
+    """
+    h, w = view.shape[:2]
+    if h == 0 or w == 0 or view.strides[1:] != (3, 1):
+        return Image.fromarray(view)
+    row_stride = view.strides[0]
+    flat = np.lib.stride_tricks.as_strided(view, shape=((h - 1) * row_stride + w * 3,), strides=(1,))
+    return Image.frombuffer("RGB", (w, h), flat, "raw", "RGB", row_stride, 1)
+
+
+def _leading_true(flags: np.ndarray) -> int:
+    """Longueur de la suite de True en tête du vecteur booléen."""
+    return int(flags.size if flags.all() else np.argmax(~flags))
 
 
 def trim_white_edges_midlines(
-    card_img: Image.Image,
+    card: np.ndarray,
+    luma: Optional[np.ndarray] = None,
     white_threshold: int = 245,
     band_frac: float = 0.10,
     max_trim_frac: float = 0.08,
     white_frac_required: float = 0.98,
-) -> Image.Image:
-    """Enlève les fines lignes blanches résiduelles en observant les bandes centrales de chaque côté."""
-    img = to_rgb_white_bg(card_img)
-    arr = np.asarray(img, dtype=np.uint8)
-    h, w = arr.shape[:2]
-    if h < 5 or w < 5:
-        return img
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Enlève les fines lignes blanches résiduelles en observant les bandes centrales de chaque côté.
 
-    y = (0.2126 * arr[:, :, 0] + 0.7152 * arr[:, :, 1] + 0.0722 * arr[:, :, 2]).astype(np.float32)
+    `card` est une vue RGB de la page ; `luma` sa luminance si elle est déjà calculée.
+    Renvoie la carte rognée et sa luminance (simples vues), pour que les étapes suivantes
+    n'aient pas à recalculer la luminance.
+    """
+    y = _luma_u8(card) if luma is None else luma
+    h, w = card.shape[:2]
+    if h < 5 or w < 5:
+        return card, y
 
     band_h = max(3, int(round(h * band_frac)))
     band_w = max(3, int(round(w * band_frac)))
@@ -162,151 +305,190 @@ def trim_white_edges_midlines(
     c0 = max(0, (w // 2) - (band_w // 2))
     c1 = min(w, c0 + band_w)
 
+    # Cas courant : aucune des quatre lignes extrêmes n'est blanche dans sa bande centrale,
+    # donc aucun rognage possible ; on évite les projections complètes des bandes
+    edges = (y[r0:r1, 0], y[r0:r1, w - 1], y[0, c0:c1], y[h - 1, c0:c1])
+    if not any((edge >= white_threshold).mean() >= white_frac_required for edge in edges):
+        return card, y
+
     max_trim_x = max(1, int(round(w * max_trim_frac)))
     max_trim_y = max(1, int(round(h * max_trim_frac)))
 
-    def is_white_col(x: int) -> bool:
-        col = y[r0:r1, x]
-        return (col >= white_threshold).mean() >= white_frac_required
+    # Un booléen par colonne (bande centrale horizontale) et par ligne (bande centrale verticale)
+    white_cols = (y[r0:r1, :] >= white_threshold).mean(axis=0) >= white_frac_required
+    white_rows = (y[:, c0:c1] >= white_threshold).mean(axis=1) >= white_frac_required
 
-    def is_white_row(r: int) -> bool:
-        row = y[r, c0:c1]
-        return (row >= white_threshold).mean() >= white_frac_required
-
-    left_trim = 0
-    for x in range(0, min(max_trim_x, w)):
-        if is_white_col(x):
-            left_trim += 1
-        else:
-            break
-    right_trim = 0
-    for dx in range(0, min(max_trim_x, w)):
-        x = w - 1 - dx
-        if is_white_col(x):
-            right_trim += 1
-        else:
-            break
-    top_trim = 0
-    for yrow in range(0, min(max_trim_y, h)):
-        if is_white_row(yrow):
-            top_trim += 1
-        else:
-            break
-    bottom_trim = 0
-    for dy in range(0, min(max_trim_y, h)):
-        r = h - 1 - dy
-        if is_white_row(r):
-            bottom_trim += 1
-        else:
-            break
+    left_trim = _leading_true(white_cols[:max_trim_x])
+    right_trim = _leading_true(white_cols[::-1][:max_trim_x])
+    top_trim = _leading_true(white_rows[:max_trim_y])
+    bottom_trim = _leading_true(white_rows[::-1][:max_trim_y])
 
     left = min(left_trim, w - 2)
     right = max(w - right_trim, left + 1)
     top = min(top_trim, h - 2)
     bottom = max(h - bottom_trim, top + 1)
-    if left > 0 or top > 0 or right < w or bottom < h:
-        img = img.crop((left, top, right, bottom))
-    return img
+    return card[top:bottom, left:right], y[top:bottom, left:right]
+
+
+# Élément structurant en croix (4-connexité)
+_CROSS = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], dtype=bool)
 
 
 def _dilate_bool(mask: np.ndarray, iterations: int = 1) -> np.ndarray:
-    """Dilatation binaire simple (4-connexité) sans SciPy."""
+    """Dilatation binaire simple (4-connexité), en une passe C avec SciPy si disponible."""
+    if iterations <= 0:
+        return mask.copy()
+    if ndimage is not None:
+        return ndimage.binary_dilation(mask, structure=_CROSS, iterations=iterations)
+    # Repli numpy : deux tampons alternés, OR en place, aucune allocation par itération
     out = mask.copy()
-    h, w = mask.shape
-    for _ in range(max(0, iterations)):
-        nb = np.zeros_like(out, dtype=np.uint8)
-        nb[:-1, :] |= out[1:, :]
-        nb[1:, :] |= out[:-1, :]
-        nb[:, :-1] |= out[:, 1:]
-        nb[:, 1:] |= out[:, :-1]
-        out = (out | nb).astype(bool)
+    nxt = np.empty_like(out)
+    for _ in range(iterations):
+        np.copyto(nxt, out)
+        nxt[:-1, :] |= out[1:, :]
+        nxt[1:, :] |= out[:-1, :]
+        nxt[:, :-1] |= out[:, 1:]
+        nxt[:, 1:] |= out[:, :-1]
+        out, nxt = nxt, out
     return out
 
 
+def _flood_from_border(floodable: np.ndarray) -> np.ndarray:
+    """Pixels de `floodable` reliés au bord de l'image (4-connexité).
+
+    Avec SciPy, un seul étiquetage des composantes connexes en C, puis on garde celles qui
+    touchent le bord ; sinon, parcours depuis les pixels du bord.
+    """
+    if ndimage is not None:
+        labels, _ = ndimage.label(floodable)
+        edge_labels = np.concatenate((labels[0, :], labels[-1, :], labels[:, 0], labels[:, -1]))
+        keep = np.zeros(int(labels.max()) + 1, dtype=bool)
+        keep[edge_labels] = True
+        keep[0] = False
+        return keep[labels]
+
+    # Repli sans SciPy : remplissage par segments de ligne (scanline). Les segments
+    # inondables de chaque ligne sont extraits une fois avec numpy ; la pile ne contient
+    # ensuite qu'un indice par segment, et non un par pixel.
+    h, w = floodable.shape
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = floodable
+    steps = np.diff(padded, axis=1)
+    seg_rows, seg_starts = np.nonzero(steps == 1)
+    _, seg_ends = np.nonzero(steps == -1)  # bornes exclues, même ordre que les débuts
+    row_first = np.searchsorted(seg_rows, np.arange(h + 1)).tolist()
+    rows, starts, ends = seg_rows.tolist(), seg_starts.tolist(), seg_ends.tolist()
+
+    seen = bytearray(len(starts))
+    stack = list(range(row_first[0], row_first[1]))  # ligne du haut
+    stack += range(row_first[h - 1], row_first[h])  # ligne du bas
+    stack += [k for k in range(len(starts)) if starts[k] == 0 or ends[k] == w]  # côtés
+    for k in stack:
+        seen[k] = 1
+
+    while stack:
+        k = stack.pop()
+        r, lo, hi = rows[k], starts[k], ends[k]
+        for nr in (r - 1, r + 1):
+            if 0 <= nr < h:
+                # Segments de la ligne voisine qui chevauchent [lo, hi)
+                j0 = bisect_right(ends, lo, row_first[nr], row_first[nr + 1])
+                j1 = bisect_left(starts, hi, row_first[nr], row_first[nr + 1])
+                for j in range(j0, j1):
+                    if not seen[j]:
+                        seen[j] = 1
+                        stack.append(j)
+
+    kept = np.frombuffer(bytes(seen), dtype=bool)
+    marks = np.zeros((h, w + 1), dtype=np.int8)
+    marks[seg_rows[kept], seg_starts[kept]] = 1
+    marks[seg_rows[kept], seg_ends[kept]] = -1
+    return np.cumsum(marks, axis=1, dtype=np.int8)[:, :w] > 0
+
+
+@functools.lru_cache(maxsize=8)
+def _corner_mask(h: int, w: int, corner_px: int) -> np.ndarray:
+    """Masque des quatre coins carrés de `corner_px` pixels d'une carte h×w.
+
+    Les cartes d'un même PDF ont presque toutes la même taille : le masque est calculé
+    une fois par taille et partagé, d'où un tableau en lecture seule.
+    """
+    rr, cc = np.ogrid[:h, :w]
+    tl = (rr < corner_px) & (cc < corner_px)
+    tr = (rr < corner_px) & (cc >= w - corner_px)
+    bl = (rr >= h - corner_px) & (cc < corner_px)
+    br = (rr >= h - corner_px) & (cc >= w - corner_px)
+    mask = tl | tr | bl | br
+    mask.flags.writeable = False
+    return mask
+
+
 def make_external_white_transparent(
-    card_img: Image.Image,
+    card: np.ndarray,
     white_threshold: int = 245,
     barrier_dilate: int = 1,
-) -> Image.Image:
+    luma: Optional[np.ndarray] = None,
+) -> np.ndarray:
     """
     Met en transparence le blanc EXTERNE à la carte (coins arrondis inclus),
     en conservant le blanc interne.
     Méthode : flood-fill des pixels 'blancs' depuis les bords, bloqué par la bordure colorée.
+    - card : carte RGB (H, W, 3) ; renvoie un nouveau tableau RGBA (H, W, 4).
     - barrier_dilate : renforce la barrière (bordure) de n pixels pour éviter les micro-fuites.
+    - luma : luminance de la carte si elle est déjà calculée (sinon calculée ici).
     """
-    if card_img.mode != "RGBA":
-        img = card_img.convert("RGBA")
-    else:
-        img = card_img.copy()
-
-    arr = np.asarray(img, dtype=np.uint8)
-    h, w = arr.shape[:2]
+    h, w = card.shape[:2]
+    out = np.empty((h, w, 4), dtype=np.uint8)
+    out[:, :, :3] = card[:, :, :3]
+    out[:, :, 3] = 255
     if h == 0 or w == 0:
-        return img
+        return out
 
-    y = (0.2126 * arr[:, :, 0] + 0.7152 * arr[:, :, 1] + 0.0722 * arr[:, :, 2]).astype(np.float32)
+    y = _luma_u8(card) if luma is None else luma
     whiteish = y >= white_threshold
 
     corner_relax = 5
     corner_thr = max(0, white_threshold - corner_relax)
     corner_px = max(2, min(10, int(round(0.01 * min(h, w)))))
     if corner_px > 0:
-        rr, cc = np.ogrid[:h, :w]
-        tl = (rr < corner_px) & (cc < corner_px)
-        tr = (rr < corner_px) & (cc >= w - corner_px)
-        bl = (rr >= h - corner_px) & (cc < corner_px)
-        br = (rr >= h - corner_px) & (cc >= w - corner_px)
-        corner_mask = tl | tr | bl | br
-        whiteish_corner = y >= corner_thr
-        whiteish = whiteish | (corner_mask & whiteish_corner)
+        whiteish |= _corner_mask(h, w, corner_px) & (y >= corner_thr)
 
     barrier = ~whiteish
     if barrier_dilate > 0:
         barrier = _dilate_bool(barrier, iterations=barrier_dilate)
 
-    floodable = whiteish & (~barrier)
-
-    visited = np.zeros((h, w), dtype=bool)
-    from collections import deque
-    q = deque()
-
-    for x in range(w):
-        if floodable[0, x]:
-            visited[0, x] = True
-            q.append((0, x))
-        if floodable[h - 1, x]:
-            visited[h - 1, x] = True
-            q.append((h - 1, x))
-    for yrow in range(h):
-        if floodable[yrow, 0]:
-            visited[yrow, 0] = True
-            q.append((yrow, 0))
-        if floodable[yrow, w - 1]:
-            visited[yrow, w - 1] = True
-            q.append((yrow, w - 1))
-
-    while q:
-        r, c = q.popleft()
-        if r > 0 and not visited[r - 1, c] and floodable[r - 1, c]:
-            visited[r - 1, c] = True
-            q.append((r - 1, c))
-        if r + 1 < h and not visited[r + 1, c] and floodable[r + 1, c]:
-            visited[r + 1, c] = True
-            q.append((r + 1, c))
-        if c > 0 and not visited[r, c - 1] and floodable[r, c - 1]:
-            visited[r, c - 1] = True
-            q.append((r, c - 1))
-        if c + 1 < w and not visited[r, c + 1] and floodable[r, c + 1]:
-            visited[r, c + 1] = True
-            q.append((r, c + 1))
-
-    alpha = np.array(img.getchannel("A"), dtype=np.uint8)
-    alpha[visited] = 0
-    out = img.copy()
-    out.putalpha(Image.fromarray(alpha))
+    # Blanc hors barrière, calculé en place dans le tampon de la barrière
+    floodable = np.logical_not(barrier, out=barrier)
+    floodable &= whiteish
+    whiteish = barrier = None
+
+    visited = _flood_from_border(floodable)
+
+    out[:, :, 3][visited] = 0
     return out
 
 
+def process_card(card: np.ndarray, args: argparse.Namespace) -> np.ndarray:
+    """Traite une carte découpée (vue RGB de la page) entièrement sur tableaux numpy.
+
+    La luminance est calculée une seule fois : le rognage n'est qu'un découpage d'indices
+    et la transparence écrit directement le canal alpha. Renvoie un tableau RGBA si le fond
+    transparent est activé, sinon la vue RGB rognée. L'image PIL n'est créée qu'ensuite.
+    """
+    card, y = trim_white_edges_midlines(
+        card,
+        white_threshold=args.white_threshold,
+        band_frac=args.band_frac,
+        max_trim_frac=args.max_trim_frac,
+        white_frac_required=args.white_frac_required,
+    )
+    if not args.transparent:
+        return card
+    return make_external_white_transparent(
+        card, white_threshold=args.white_threshold, barrier_dilate=args.barrier_dilate, luma=y
+    )
+
+
 # ------------------------------
 # Détection couleurs (bordure & timer)
 # ------------------------------
@@ -334,9 +516,21 @@ def _hue_distance(a: float, b: float) -> float:
 
 
 def _rgb_to_hsv_deg(rgb: Tuple[int, int, int]) -> Tuple[float, float, float]:
-    r, g, b = rgb
-    h, s, v = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
-    return h * 360.0, s, v
+    # Teinte en degrés, saturation et valeur dans [0, 1], sans passer par colorsys. Même
+    # ordre d'opérations que colorsys.rgb_to_hsv : les teintes limites (ex. pile à la
+    # tolérance de classification) restent identiques au bit près.
+    r, g, b = (c / 255.0 for c in rgb)
+    mx = max(r, g, b)
+    d = mx - min(r, g, b)
+    if d == 0:
+        return 0.0, 0.0, mx
+    if mx == r:
+        h = (mx - b) / d - (mx - g) / d
+    elif mx == g:
+        h = 2.0 + (mx - r) / d - (mx - b) / d
+    else:
+        h = 4.0 + (mx - g) / d - (mx - r) / d
+    return (h / 6.0) % 1.0 * 360.0, d / mx, mx
 
 
 def _classify_hsv(h: float, s: float, v: float, candidates: Dict[ColorName, float]) -> ColorName:
@@ -355,15 +549,18 @@ def _classify_hsv(h: float, s: float, v: float, candidates: Dict[ColorName, floa
 def _median_rgb(pixels: np.ndarray) -> Optional[Tuple[int, int, int]]:
     if pixels.size == 0:
         return None
-    # pixels shape: (N, 3)
-    r = int(np.median(pixels[:, 0]))
-    g = int(np.median(pixels[:, 1]))
-    b = int(np.median(pixels[:, 2]))
+    # pixels shape: (N, 3) ; une sélection partielle sur les trois canaux à la fois,
+    # au lieu de trois tris complets. Pour N pair, moyenne des deux valeurs centrales
+    # tronquée, comme int(np.median(...)).
+    n = pixels.shape[0]
+    lo, hi = (n - 1) // 2, n // 2
+    part = np.partition(pixels, (lo, hi), axis=0)
+    r, g, b = ((part[lo].astype(np.int32) + part[hi]) // 2).tolist()
     return (r, g, b)
 
 
 def sample_border_color(
-    card_img: Image.Image,
+    card: np.ndarray,
     offset_px: int = 6,
     band_px: int = 6,
     half_width_px: int = 2,
@@ -375,14 +572,11 @@ def sample_border_color(
     teintes peu saturées (vert clair, violet). On sélectionne les pixels les plus
     saturés dans cette fenêtre puis on prend la médiane de leurs RGB.
 
+    `card` est un tableau RGB (H, W, 3) ou RGBA (H, W, 4), lu sans copie.
     Ignore les pixels entièrement transparents si présents.
     """
-    if card_img.mode not in ("RGB", "RGBA"):
-        img = card_img.convert("RGBA")
-    else:
-        img = card_img
-
-    arr = np.asarray(img, dtype=np.uint8)
+    arr = card
+    has_alpha = arr.shape[2] == 4
     h, w = arr.shape[:2]
     if h == 0 or w == 0:
         return None
@@ -399,7 +593,7 @@ def sample_border_color(
     if region.size == 0:
         return None
 
-    if img.mode == "RGBA":
+    if has_alpha:
         alpha = region[:, :, 3].astype(np.uint16)
         alpha_mask = alpha >= 200
         rgb_region = region[:, :, :3]
@@ -407,17 +601,13 @@ def sample_border_color(
         alpha_mask = np.ones(region.shape[:2], dtype=bool)
         rgb_region = region
 
-    # Calcule saturation approx et valeur (V) pour filtrer le blanc/gris
-    r = rgb_region[:, :, 0].astype(np.float32)
-    g = rgb_region[:, :, 1].astype(np.float32)
-    b = rgb_region[:, :, 2].astype(np.float32)
+    # Saturation et valeur (V) pour filtrer le blanc/gris, en entiers sur les uint8 :
+    # s >= 0.12 <=> 100*(max-min) >= 12*max, et v >= 0.18 <=> max >= 46
+    r, g, b = rgb_region[:, :, 0], rgb_region[:, :, 1], rgb_region[:, :, 2]
     maxc = np.maximum(np.maximum(r, g), b)
-    minc = np.minimum(np.minimum(r, g), b)
-    with np.errstate(divide="ignore", invalid="ignore"):
-        s = np.where(maxc > 0, (maxc - minc) / maxc, 0.0)
-    v = maxc / 255.0
+    sat = maxc - np.minimum(np.minimum(r, g), b)
 
-    color_mask = (s >= 0.12) & (v >= 0.18)
+    color_mask = (sat.astype(np.uint16) * 100 >= maxc.astype(np.uint16) * 12) & (maxc >= 46)
     mask = alpha_mask & color_mask
 
     if not np.any(mask):
@@ -425,7 +615,7 @@ def sample_border_color(
         y0f = min(max(0, offset_px), h - 1)
         y1f = min(h, y0f + max(1, band_px))
         region2 = arr[y0f:y1f, x0:x1, :]
-        if img.mode == "RGBA":
+        if has_alpha:
             alpha2 = region2[:, :, 3]
             mask2 = alpha2 >= 200
             rgb2 = region2[:, :, :3][mask2]
@@ -433,17 +623,19 @@ def sample_border_color(
             rgb2 = region2.reshape(-1, 3)
         return _median_rgb(rgb2.reshape(-1, 3)) if rgb2.size else None
 
-    # Prend les pixels les plus saturés (top 15% ou au moins 20)
-    s_flat = s[mask].ravel()
-    rgb_flat = rgb_region[mask].reshape(-1, 3)
-    if s_flat.size == 0:
-        return None
-    k = max(20, int(0.15 * s_flat.size))
-    if k >= s_flat.size:
+    # Garde les pixels les plus saturés : ceux à au moins 85 % de la saturation maximale
+    # (seuil direct, sans tri partiel) ; s'il y en a moins de 20 (bordure fine), les 20
+    # plus saturés. La saturation en flottant n'est calculée que sur les pixels retenus
+    # (max > 0 garanti).
+    rgb_flat = rgb_region[mask]
+    s_flat = sat[mask] / maxc[mask].astype(np.float32)
+    top = s_flat >= 0.85 * s_flat.max()
+    if np.count_nonzero(top) >= 20:
+        top_rgb = rgb_flat[top]
+    elif s_flat.size <= 20:
         top_rgb = rgb_flat
     else:
-        idx = np.argpartition(s_flat, -k)[-k:]
-        top_rgb = rgb_flat[idx]
+        top_rgb = rgb_flat[np.argpartition(s_flat, -20)[-20:]]
 
     return _median_rgb(top_rgb)
 
@@ -467,7 +659,7 @@ def classify_border_color(rgb: Optional[Tuple[int, int, int]]) -> ColorName:
 
 
 def sample_timer_color(
-    card_img: Image.Image,
+    card: np.ndarray,
     timer_x_abs: int = 1100,
     timer_y_abs_from_bottom: int = 725,
     ref_w: int = 1177,
@@ -478,14 +670,11 @@ def sample_timer_color(
     - timer_x_abs, timer_y_abs_from_bottom : coordonnées absolues pour l'image de référence ref_w×ref_h
       (origine en bas-gauche). Pour une autre taille, on applique un scaling proportionnel.
     - radius : taille de la fenêtre carrée de sampling (2r+1)^2.
+    `card` est un tableau RGB (H, W, 3) ou RGBA (H, W, 4), lu sans copie.
     Ignore les pixels entièrement transparents si présents.
     """
-    if card_img.mode not in ("RGB", "RGBA"):
-        img = card_img.convert("RGBA")
-    else:
-        img = card_img
-
-    arr = np.asarray(img, dtype=np.uint8)
+    arr = card
+    has_alpha = arr.shape[2] == 4
     h, w = arr.shape[:2]
     if h == 0 or w == 0:
         return None
@@ -501,7 +690,7 @@ def sample_timer_color(
     y1 = min(h, ty + radius + 1)
 
     region = arr[y0:y1, x0:x1, :]
-    if img.mode == "RGBA":
+    if has_alpha:
         alpha = region[:, :, 3]
         mask = alpha >= 200
         rgb = region[:, :, :3][mask]
@@ -646,6 +835,188 @@ def ask_user_to_choose_pdf(search_dir: str) -> List[str]:
         print("Veuillez entrer un chapitre valide, 0 ou '?'.")
 
 
+# Threads d'encodage des images ; le pool est créé une fois par processus
+SAVE_THREADS = 4
+_SAVE_POOL: Optional[Tuple[int, ThreadPoolExecutor]] = None
+
+
+def _get_save_pool() -> ThreadPoolExecutor:
+    global _SAVE_POOL
+    # Un pool hérité par fork n'a plus de threads : on en recrée un dans chaque processus
+    if _SAVE_POOL is None or _SAVE_POOL[0] != os.getpid():
+        _SAVE_POOL = (os.getpid(), ThreadPoolExecutor(max_workers=SAVE_THREADS))
+    return _SAVE_POOL[1]
+
+
+def _save_image(task: Tuple[Image.Image, str, Dict[str, Any]]) -> None:
+    img, path, save_kwargs = task
+    img.save(path, **save_kwargs)
+
+
+def _wait_saves(saves: List[Future]) -> None:
+    """Attend les enregistrements en cours et relance la première erreur rencontrée."""
+    for fut in saves:
+        fut.result()
+    saves.clear()
+
+
+def _save_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.output_format == "webp":
+        save_kwargs: Dict[str, Any] = {"format": "WEBP", "method": args.webp_method}
+        # En lossless, libwebp lit la qualité comme un effort de compression (défaut 0)
+        save_kwargs["quality"] = args.webp_quality
+        if args.webp_lossless:
+            save_kwargs["lossless"] = True
+        return save_kwargs
+    return {"format": "PNG", "compress_level": args.png_compress_level}
+
+
+# Au-delà de ~6 processus le rendu PyMuPDF ne gagne presque plus rien
+MAX_AUTO_WORKERS = 6
+
+
+def process_page(
+    doc: fitz.Document,
+    pno: int,
+    out_dir: str,
+    args: argparse.Namespace,
+    arr: Optional[np.ndarray] = None,
+    saves: Optional[List[Future]] = None,
+) -> List[Dict[str, Any]]:
+    """Traite une page (rendu, découpe, 4 cartes recto/verso) et enregistre ses images.
+
+    Les cartes de la page `pno` portent les numéros pno*4+1 à pno*4+4. Renvoie, pour
+    chaque carte, ses tags et ses dimensions pour le manifest.
+    - arr : rendu de la page déjà calculé (préchargement) ; sinon la page est rendue ici.
+    - saves : liste où ajouter les enregistrements lancés en arrière-plan, que l'appelant
+      attend avec _wait_saves ; sans liste, ils sont attendus avant de rendre la main.
+    """
+    seq_index = pno * 4 + 1
+    ext = args.output_format
+    front_prefix = os.path.join(out_dir, "front")
+    back_prefix = os.path.join(out_dir, "back")
+
+    if arr is None:
+        arr = render_page(doc, pno, dpi=args.dpi)
+    cropped = crop_to_one_px_margin(arr, white_threshold=args.white_threshold)
+    left_half, right_half = split_halves(cropped)
+
+    if left_half.shape[0] != right_half.shape[0]:
+        fail("Format violation: left/right halves have different heights after cropping.")
+
+    left_rows = split_rows(left_half, expected_rows=4)  # fronts
+    right_rows = split_rows(right_half, expected_rows=4)  # backs
+    del cropped, left_half, right_half
+
+    # Les encodeurs PNG/WebP de Pillow relâchent le GIL : chaque carte s'encode dans le pool
+    # pendant que la suivante est traitée
+    save_pool = _get_save_pool()
+    save_kwargs = _save_kwargs(args)
+    page_saves: List[Future] = []
+
+    records: List[Dict[str, Any]] = []
+    for row_idx in range(4):
+        front = process_card(left_rows[row_idx], args)
+        back = process_card(right_rows[row_idx], args)
+
+        border_rgb = sample_border_color(
+            front, offset_px=args.border_offset, band_px=args.border_band, half_width_px=2
+        )
+        border_color = classify_border_color(border_rgb)
+
+        if border_color == "purple":
+            timer_color: ColorName = "none"
+        else:
+            timer_rgb = sample_timer_color(
+                front,
+                timer_x_abs=args.timer_x,
+                timer_y_abs_from_bottom=args.timer_y,
+                ref_w=args.timer_ref_w,
+                ref_h=args.timer_ref_h,
+                radius=args.timer_radius,
+            )
+            timer_color = classify_timer_color(timer_rgb)
+
+        front_name = f"{front_prefix}{seq_index}.{ext}"
+        back_name = f"{back_prefix}{seq_index}.{ext}"
+        # L'image PIL n'est créée que pour l'encodage ; la tâche la garde jusqu'à la fin
+        page_saves.append(save_pool.submit(_save_image, (_image_from_view(front), front_name, save_kwargs)))
+        page_saves.append(save_pool.submit(_save_image, (_image_from_view(back), back_name, save_kwargs)))
+
+        records.append(
+            {
+                "num": seq_index,
+                "border": border_color,
+                "timer": timer_color,
+                "front": (front.shape[1], front.shape[0]),
+                "back": (back.shape[1], back.shape[0]),
+            }
+        )
+        seq_index += 1
+
+    if len(records) != 4:
+        fail("Internal error: did not produce exactly 4 fronts and 4 backs for this page.")
+
+    # Avec le fond transparent, les cartes sont des copies : plus rien ne retient le rendu
+    # de la page, qui peut être libéré pendant l'encodage
+    arr = left_rows = right_rows = None
+    if saves is None:
+        _wait_saves(page_saves)
+    else:
+        saves.extend(page_saves)
+    return records
+
+
+# Document ouvert dans un processus du pool, gardé d'une plage de pages à l'autre
+_WORKER_DOC: Optional[Tuple[str, fitz.Document]] = None
+
+
+def _worker_doc(in_path: str) -> fitz.Document:
+    global _WORKER_DOC
+    # Chaque processus ouvre son propre document : un fitz.Document ne se partage pas entre processus
+    if _WORKER_DOC is None or _WORKER_DOC[0] != in_path:
+        if _WORKER_DOC is not None:
+            _WORKER_DOC[1].close()
+        _WORKER_DOC = (in_path, fitz.open(in_path))
+    return _WORKER_DOC[1]
+
+
+def _process_pages_worker(
+    in_path: str, pages: range, out_dir: str, args: argparse.Namespace
+) -> List[List[Dict[str, Any]]]:
+    """Traite une plage de pages contiguës dans un processus du pool."""
+    doc = _worker_doc(in_path)
+    results = []
+    saves: List[Future] = []
+    for pno in pages:
+        # Les images de la page précédente s'encodent pendant le traitement de celle-ci
+        previous, saves = saves, []
+        results.append(process_page(doc, pno, out_dir, args, saves=saves))
+        _wait_saves(previous)
+    _wait_saves(saves)
+    return results
+
+
+def _iter_pages_prefetched(doc: fitz.Document, out_dir: str, args: argparse.Namespace):
+    """Traite les pages dans l'ordre en rendant la page suivante dans un thread pendant
+    l'encodage de la page courante. Seul ce thread touche au document."""
+
+    saves: List[Future] = []
+    with ThreadPoolExecutor(max_workers=1) as render_pool:
+        pending = render_pool.submit(render_page, doc, 0, args.dpi)
+        for pno in range(doc.page_count):
+            arr = pending.result()
+            if pno + 1 < doc.page_count:
+                pending = render_pool.submit(render_page, doc, pno + 1, args.dpi)
+            # Les images de la page précédente s'encodent pendant le traitement de celle-ci
+            previous, saves = saves, []
+            records = process_page(doc, pno, out_dir, args, arr=arr, saves=saves)
+            arr = None  # ne pas garder la page pendant que l'appelant écrit ses résultats
+            _wait_saves(previous)
+            yield records
+    _wait_saves(saves)
+
+
 def process_pdf(in_path: str, args: argparse.Namespace) -> None:
     base_name = os.path.splitext(os.path.basename(in_path))[0]
     out_dir = os.path.join(os.path.dirname(in_path), base_name)
@@ -660,27 +1031,49 @@ def process_pdf(in_path: str, args: argparse.Namespace) -> None:
     if doc.page_count == 0:
         fail("Empty PDF: no pages.")
 
+    page_count = doc.page_count
+    workers = min(args.workers or min(os.cpu_count() or 1, MAX_AUTO_WORKERS), page_count)
+
     print(f"\n=== Traitement de : {in_path} ===")
     print(f"Dossier de sortie : {out_dir}")
-    print(f"Pages : {doc.page_count} | DPI : {args.dpi} | white-threshold : {args.white_threshold}")
+    print(f"Pages : {page_count} | DPI : {args.dpi} | white-threshold : {args.white_threshold} | workers : {workers}")
     if args.output_format == "webp":
         print(
             "Transparent: {} | barrier-dilate: {} | format: webp (lossless: {}, quality: {}, method: {})".format(
                 args.transparent, args.barrier_dilate, args.webp_lossless, args.webp_quality, args.webp_method
             )
         )
+        if args.webp_method < 6:
+            print("Note : --webp-method 6 compresse à peine mieux, pour un encodage 2-3x plus lent.")
     else:
         print(
-            "Transparent: {} | barrier-dilate: {} | format: png".format(
-                args.transparent, args.barrier_dilate
+            "Transparent: {} | barrier-dilate: {} | format: png (compress-level: {})".format(
+                args.transparent, args.barrier_dilate, args.png_compress_level
+            )
+        )
+
+    if workers > 1:
+        doc.close()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        chunk = math.ceil(page_count / workers)
+        page_ranges = [range(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+        page_results = itertools.chain.from_iterable(
+            pool.map(
+                _process_pages_worker,
+                [in_path] * len(page_ranges),
+                page_ranges,
+                [out_dir] * len(page_ranges),
+                [args] * len(page_ranges),
             )
         )
+    else:
+        pool = None
+        page_results = _iter_pages_prefetched(doc, out_dir, args)
 
     cards_by_border = {"green": [], "orange": [], "red": [], "purple": [], "unknown": []}
     cards_by_timer = {"green": [], "yellow": [], "orange": [], "red": [], "none": [], "unknown": []}
     per_card: Dict[str, Dict[str, Any]] = {}
 
-    seq_index = 1
     total_fronts = total_backs = 0
     ext = args.output_format
     canonical_front_size: Optional[Tuple[int, int]] = None
@@ -688,118 +1081,44 @@ def process_pdf(in_path: str, args: argparse.Namespace) -> None:
     front_size_consistent = True
     back_size_consistent = True
 
-    for pno in range(doc.page_count):
-        page = doc.load_page(pno)
-        print(f"Processing page {pno + 1}/{doc.page_count}...")
-        base_fronts = total_fronts
-        base_backs = total_backs
-
-        img = render_page_to_image(page, dpi=args.dpi)
-        cropped = crop_to_one_px_margin(img, white_threshold=args.white_threshold)
-        left_half, right_half = split_halves(cropped)
-
-        if left_half.height != right_half.height:
-            fail("Format violation: left/right halves have different heights after cropping.")
-
-        left_rows = split_rows(left_half, expected_rows=4)  # fronts
-        right_rows = split_rows(right_half, expected_rows=4)  # backs
-
-        for row_idx in range(4):
-            front_img = left_rows[row_idx]
-            back_img = right_rows[row_idx]
-
-            front_img = trim_white_edges_midlines(
-                front_img,
-                white_threshold=args.white_threshold,
-                band_frac=args.band_frac,
-                max_trim_frac=args.max_trim_frac,
-                white_frac_required=args.white_frac_required,
-            )
-            back_img = trim_white_edges_midlines(
-                back_img,
-                white_threshold=args.white_threshold,
-                band_frac=args.band_frac,
-                max_trim_frac=args.max_trim_frac,
-                white_frac_required=args.white_frac_required,
-            )
-
-            if args.transparent:
-                front_img = make_external_white_transparent(
-                    front_img, white_threshold=args.white_threshold, barrier_dilate=args.barrier_dilate
-                )
-                back_img = make_external_white_transparent(
-                    back_img, white_threshold=args.white_threshold, barrier_dilate=args.barrier_dilate
-                )
-            else:
-                if front_img.mode != "RGB":
-                    front_img = front_img.convert("RGB")
-                if back_img.mode != "RGB":
-                    back_img = back_img.convert("RGB")
-
-            border_rgb = sample_border_color(
-                front_img, offset_px=args.border_offset, band_px=args.border_band, half_width_px=2
-            )
-            border_color = classify_border_color(border_rgb)
-
-            if border_color == "purple":
-                timer_color: ColorName = "none"
-            else:
-                timer_rgb = sample_timer_color(
-                    front_img,
-                    timer_x_abs=args.timer_x,
-                    timer_y_abs_from_bottom=args.timer_y,
-                    ref_w=args.timer_ref_w,
-                    ref_h=args.timer_ref_h,
-                    radius=args.timer_radius,
+    try:
+        for pno, records in enumerate(page_results):
+            print(f"Processing page {pno + 1}/{page_count}...")
+            for record in records:
+                num = record["num"]
+                border_color = record["border"]
+                timer_color = record["timer"]
+                front_size = record["front"]
+                back_size = record["back"]
+
+                total_fronts += 1
+                total_backs += 1
+                print(
+                    f"  Saved front{num}.{ext} & back{num}.{ext} | border={border_color} | timer={timer_color}"
                 )
-                timer_color = classify_timer_color(timer_rgb)
-
-            front_name = os.path.join(out_dir, f"front{seq_index}.{ext}")
-            back_name = os.path.join(out_dir, f"back{seq_index}.{ext}")
-
-            if ext == "webp":
-                save_kwargs = {"format": "WEBP", "method": args.webp_method}
-                if args.webp_lossless:
-                    save_kwargs["lossless"] = True
-                else:
-                    save_kwargs["quality"] = args.webp_quality
-            else:
-                save_kwargs = {"format": "PNG", "optimize": True}
-
-            front_img.save(front_name, **save_kwargs)
-            back_img.save(back_name, **save_kwargs)
-
-            total_fronts += 1
-            total_backs += 1
-            print(
-                f"  Saved front{seq_index}.{ext} & back{seq_index}.{ext} | border={border_color} | timer={timer_color}"
-            )
-
-            num = seq_index
-            cards_by_border.get(border_color, cards_by_border["unknown"]).append(num)
-            cards_by_timer.get(timer_color, cards_by_timer["unknown"]).append(num)
-            front_size = (front_img.width, front_img.height)
-            back_size = (back_img.width, back_img.height)
-            if canonical_front_size is None:
-                canonical_front_size = front_size
-            elif canonical_front_size != front_size:
-                front_size_consistent = False
-            if canonical_back_size is None:
-                canonical_back_size = back_size
-            elif canonical_back_size != back_size:
-                back_size_consistent = False
-
-            per_card[str(num)] = {
-                "border": border_color,
-                "timer": timer_color,
-                "front": {"width": front_img.width, "height": front_img.height},
-                "back": {"width": back_img.width, "height": back_img.height},
-            }
 
-            seq_index += 1
-
-        if total_fronts - base_fronts != 4 or total_backs - base_backs != 4:
-            fail("Internal error: did not produce exactly 4 fronts and 4 backs for this page.")
+                cards_by_border.get(border_color, cards_by_border["unknown"]).append(num)
+                cards_by_timer.get(timer_color, cards_by_timer["unknown"]).append(num)
+                if canonical_front_size is None:
+                    canonical_front_size = front_size
+                elif canonical_front_size != front_size:
+                    front_size_consistent = False
+                if canonical_back_size is None:
+                    canonical_back_size = back_size
+                elif canonical_back_size != back_size:
+                    back_size_consistent = False
+
+                per_card[str(num)] = {
+                    "border": border_color,
+                    "timer": timer_color,
+                    "front": {"width": front_size[0], "height": front_size[1]},
+                    "back": {"width": back_size[0], "height": back_size[1]},
+                }
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        else:
+            doc.close()
 
     manifest: Dict[str, Any] = {
         "chapter": base_name,
@@ -847,6 +1166,12 @@ def main():
         help="Nom ou chemin d'un PDF à traiter directement (sans sélection interactive).",
     )
     parser.add_argument("--dpi", type=int, default=300, help="DPI de rendu (défaut 300).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Nombre de processus pour traiter les pages en parallèle (défaut 0 = nombre de cœurs, 6 au plus).",
+    )
     parser.add_argument("--white-threshold", type=int, default=220, help="Seuil 0–255 pour 'blanc' (défaut 220).")
     parser.add_argument("--band-frac", type=float, default=0.10, help="Épaisseur de bande centrale (trim) 0–0.5.")
     parser.add_argument("--max-trim-frac", type=float, default=0.08, help="Rognage max par côté (trim) en fraction.")
@@ -872,15 +1197,30 @@ def main():
         help="Format des images de sortie (défaut: webp).",
     )
     parser.add_argument(
-        "--webp-quality", type=int, default=88, help="Qualité WebP lossy 0-100 (défaut 88)."
+        "--webp-quality",
+        type=int,
+        default=None,
+        help="Qualité WebP lossy 0-100 (défaut 88). En lossless : effort de compression 0-100 (défaut 0 = le plus rapide).",
+    )
+    parser.add_argument(
+        "--webp-method",
+        type=int,
+        default=4,
+        help="Effort d'encodage WebP 0-6 (défaut 4 ; 6 = max, 2-3x plus lent pour un gain de taille minime).",
     )
     parser.add_argument(
-        "--webp-method", type=int, default=6, help="Effort d'encodage WebP 0-6 (défaut 6 = max)."
+        "--png-compress-level",
+        type=int,
+        default=1,
+        help="Niveau de compression zlib PNG 0-9 (défaut 1 = rapide, toujours sans perte).",
     )
     parser.add_argument(
         "--webp-lossless",
         action="store_true",
-        help="Active l'encodage WebP lossless (ignore la qualité lossy).",
+        help=(
+            "Active l'encodage WebP lossless. --webp-quality y règle alors l'effort de compression "
+            "(défaut 0 = le plus rapide, fichiers à peine plus gros ; les pixels restent identiques)."
+        ),
     )
 
     g = parser.add_mutually_exclusive_group()
@@ -892,9 +1232,12 @@ def main():
     args = parser.parse_args()
     args.output_format = args.output_format.lower()
     if args.output_format == "webp":
+        if args.webp_quality is None:
+            args.webp_quality = 0 if args.webp_lossless else 88
         args.webp_quality = max(0, min(100, args.webp_quality))
         args.webp_method = max(0, min(6, args.webp_method))
     else:
+        args.png_compress_level = max(0, min(9, args.png_compress_level))
         if args.webp_lossless:
             print("Attention: --webp-lossless ignoré car le format de sortie est PNG.")
             args.webp_lossless = False